@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # numba is optional; decorated kernels then run as plain NumPy
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
@@ -14,13 +14,30 @@ from .var import (
     component_var_parametric,
 )
 from .portfolio import (
+    _PositionsSoA,
     load_positions,
     load_prices,
     portfolio_valuation,
-    portfolio_returns,
     exposures_by_asset_class,
 )
 
+@dataclass(frozen=True)
+class RiskStats:
+    """
+    Lookback statistics shared by all VaR methods; covw = cov @ weights and
+    sigma_p = sqrt(w.cov.w) feed the parametric, component and Monte Carlo methods.
+    """
+    lookback_days: int
+    mu: np.ndarray
+    cov: np.ndarray
+    weights: np.ndarray
+    covw: np.ndarray
+    sigma_p: float
+    pnl: pd.Series
+    port_val: float
+    risky_assets: np.ndarray
+    asof: pd.Timestamp
+
 @dataclass(frozen=True)
 class RiskReport:
     asof: pd.Timestamp
@@ -43,12 +60,23 @@ class RiskEngine:
       - Component VaR (parametric) by asset
       - Asset-class exposures and PnL series
       - Stress test results (scenario and historical window)
+
+    positions and prices are held by reference and must not be mutated after
+    construction; derived arrays and caches are built from them once.
     """
 
     def __init__(self, positions: pd.DataFrame, prices: pd.DataFrame):
-        self.positions = positions.copy()
-        self.prices = prices.copy().sort_index()
+        self.positions = positions
+        self.prices = prices if prices.index.is_monotonic_increasing else prices.sort_index()
         self._validate()
+        # float32 mirror of prices for the bandwidth-bound return/covariance path
+        self._px_arr = np.ascontiguousarray(self.prices.to_numpy(dtype=np.float32))
+        self._pos = _PositionsSoA.from_frame(self.positions)
+        # risky asset labels in positions order, their price-column positions and their asset_index positions
+        cols = self.prices.columns
+        self._risky_assets = pd.Index([a for a in pd.unique(self._pos.assets) if a != "CASH_USD" and a in cols])
+        self._col_idx = cols.get_indexer(self._risky_assets)
+        self._perm = np.array([self._pos.asset_to_idx[a] for a in self._risky_assets], dtype=np.int64)
 
     @classmethod
     def from_csv(cls, positions_path: str, prices_path: str) -> "RiskEngine":
@@ -65,6 +93,50 @@ class RiskEngine:
         if missing:
             raise ValueError(f"Missing price series for assets: {missing}")
 
+    def _compute_stats(self, lookback_days: int) -> RiskStats:
+        """
+        Lookback statistics for build_report; depends only on lookback_days, so callers
+        (e.g. the dashboard) can cache it across alpha/horizon/sims changes.
+        """
+        # Align last lookback window
+        P = self._px_arr[-(lookback_days + 1):]
+        dates = self.prices.index[-(lookback_days + 1):]
+        asof = dates[-1]
+
+        port_val, asset_values = portfolio_valuation(self._pos, self.prices.iloc[-1])
+
+        # Daily arithmetic returns in one contiguous float32 block; rows with gaps
+        # are dropped as pct_change().dropna() would
+        R = P[1:] / P[:-1] - 1.0
+        valid = ~np.isnan(R).any(axis=1)
+        risky_assets, perm = self._risky_assets, self._perm
+        R = R[valid][:, self._col_idx]
+
+        # mean and sample covariance via a single GEMM on the centred returns,
+        # accumulated in float32 and promoted to float64 for downstream linear algebra
+        mu = R.mean(axis=0, dtype=np.float64)
+        Rc = R - mu.astype(np.float32)
+        cov = (Rc.T @ Rc).astype(np.float64) / (R.shape[0] - 1)
+
+        # static-position portfolio PnL (linear approximation) as one GEMV
+        weights = asset_values.to_numpy()[perm] / port_val
+        pnl = pd.Series((R @ weights.astype(np.float32)).astype(np.float64) * port_val, index=dates[1:][valid])
+
+        covw = cov @ weights
+        sigma_p = float(np.sqrt(max(float(weights @ covw), 0.0)))
+        return RiskStats(
+            lookback_days=lookback_days,
+            mu=mu,
+            cov=cov,
+            weights=weights,
+            covw=covw,
+            sigma_p=sigma_p,
+            pnl=pnl,
+            port_val=float(port_val),
+            risky_assets=risky_assets.to_numpy(),
+            asof=asof,
+        )
+
     def build_report(
         self,
         lookback_days: int = 252,
@@ -72,39 +144,40 @@ class RiskEngine:
         alpha: float = 0.99,
         mc_sims: int = 20000,
         include_component_var: bool = True,
+        stats: Optional[RiskStats] = None,
     ) -> RiskReport:
-        # Align last lookback window
-        px = self.prices.tail(lookback_days + 1)
-        asof = px.index[-1]
-
-        port_val, asset_values = portfolio_valuation(self.positions, px.loc[asof])
-        rets, pnl = portfolio_returns(self.positions, px)
+        """
+        stats: optional precomputed output of _compute_stats(lookback_days).
+        """
+        if stats is None:
+            stats = self._compute_stats(lookback_days)
+        elif stats.lookback_days != lookback_days:
+            raise ValueError(f"stats were computed for lookback_days={stats.lookback_days}, not {lookback_days}")
+        mu, cov, weights, covw, sigma_p = stats.mu, stats.cov, stats.weights, stats.covw, stats.sigma_p
+        pnl, port_val, risky_assets, asof = stats.pnl, stats.port_val, stats.risky_assets, stats.asof
 
         # VaR/CVaR methods
         var_rows = []
         # Parametric: scale by sqrt(horizon) assuming iid
-        mu = rets.mean().values
-        cov = rets.cov().values
-        weights = (asset_values / port_val).reindex(rets.columns).fillna(0.0).values
-        p_var, p_cvar = parametric_var_cvar(mu, cov, weights, port_val, alpha=alpha, horizon_days=horizon_days)
+        p_var, p_cvar = parametric_var_cvar(mu, cov, weights, port_val, alpha=alpha, horizon_days=horizon_days, covw=covw, sigma_p=sigma_p)
 
         var_rows.append({"method": "Parametric (Gaussian)", "VaR": p_var, "CVaR": p_cvar})
 
         h_var, h_cvar = historical_var_cvar(pnl, port_val, alpha=alpha, horizon_days=horizon_days)
         var_rows.append({"method": "Historical", "VaR": h_var, "CVaR": h_cvar})
 
-        mc_var, mc_cvar = monte_carlo_var_cvar(mu, cov, weights, port_val, alpha=alpha, horizon_days=horizon_days, n_sims=mc_sims)
+        mc_var, mc_cvar = monte_carlo_var_cvar(mu, cov, weights, port_val, alpha=alpha, horizon_days=horizon_days, n_sims=mc_sims, sigma_p=sigma_p)
         var_rows.append({"method": f"Monte Carlo (Gaussian, {mc_sims:,} sims)", "VaR": mc_var, "CVaR": mc_cvar})
 
         var_cvar_df = pd.DataFrame(var_rows)
 
         component_df = None
         if include_component_var:
-            component_df = component_var_parametric(mu, cov, weights, port_val, alpha=alpha, horizon_days=horizon_days)
-            component_df["asset"] = list(rets.columns)
+            component_df = component_var_parametric(mu, cov, weights, port_val, alpha=alpha, horizon_days=horizon_days, covw=covw, sigma_p=sigma_p)
+            component_df["asset"] = list(risky_assets)
             component_df = component_df[["asset", "weight", "marginal_VaR", "component_VaR"]].sort_values("component_VaR", ascending=False)
 
-        exposures = exposures_by_asset_class(self.positions, px.loc[asof])
+        exposures = exposures_by_asset_class(self._pos, self.prices.loc[asof])
 
         return RiskReport(
             asof=asof,
@@ -116,4 +189,4 @@ class RiskEngine:
         )
 
     def stress_tester(self) -> StressTester:
-        return StressTester(self.positions, self.prices)
+        return StressTester(self.positions, self.prices, pos=self._pos)
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import Dict
+
 import pandas as pd
 import numpy as np
 
@@ -19,14 +22,89 @@ def load_prices(path: str) -> pd.DataFrame:
     df = df.set_index("date").sort_index()
     return df
 
-def portfolio_valuation(positions: pd.DataFrame, spot_prices: pd.Series) -> tuple[float, pd.Series]:
+@dataclass(frozen=True)
+class _PositionsSoA:
+    """
+    Positions as parallel NumPy arrays (one entry per row), built once so valuation
+    helpers index arrays instead of querying the DataFrame on every call.
+    """
+    assets: np.ndarray
+    qty: np.ndarray
+    is_cash: np.ndarray
+    asset_codes: np.ndarray
+    asset_index: pd.Index
+    asset_to_idx: Dict[str, int]
+    asset_class_codes: np.ndarray
+    asset_classes: pd.Index
+
+    @classmethod
+    def from_frame(cls, positions: pd.DataFrame) -> "_PositionsSoA":
+        assets = positions["asset"].to_numpy()
+        # sorted, so asset_values keeps the asset order a groupby would give
+        asset_codes, asset_index = pd.factorize(assets, sort=True)
+        if "asset_class" in positions.columns:
+            asset_class = positions["asset_class"].to_numpy()
+        else:
+            asset_class = np.full(len(assets), "Unknown", dtype=object)
+        asset_class_codes, asset_classes = pd.factorize(asset_class, sort=True)
+        asset_index = pd.Index(asset_index, name="asset")
+        return cls(
+            assets=assets,
+            # NaN quantities count as flat, as the groupby sums they replace skipped them
+            qty=np.nan_to_num(positions["quantity"].to_numpy(dtype=np.float64)),
+            is_cash=assets == "CASH_USD",
+            asset_codes=asset_codes,
+            asset_index=asset_index,
+            asset_to_idx={a: i for i, a in enumerate(asset_index)},
+            asset_class_codes=asset_class_codes.astype(np.int32),
+            asset_classes=pd.Index(asset_classes, name="asset_class"),
+        )
+
+    @property
+    def cash(self) -> float:
+        return float(self.qty[self.is_cash].sum())
+
+def _as_soa(positions: pd.DataFrame | _PositionsSoA) -> _PositionsSoA:
+    return positions if isinstance(positions, _PositionsSoA) else _PositionsSoA.from_frame(positions)
+
+def _group_sum(codes: np.ndarray, weights: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Per-group sums of weights; code -1 (a NaN key from pd.factorize) is dropped,
+    as pandas groupby drops NaN keys.
+    """
+    keep = codes >= 0
+    return np.bincount(codes[keep], weights=weights[keep], minlength=n_groups)
+
+def _position_values(pos: _PositionsSoA, spot_prices: pd.Series) -> np.ndarray:
+    """
+    Per-row market values; CASH_USD is valued at 1.0, unknown assets at NaN.
+    """
+    price = np.where(pos.is_cash, 1.0, spot_prices.reindex(pos.assets).to_numpy(dtype=np.float64))
+    return pos.qty * price
+
+def _aligned_qty_vector(pos: _PositionsSoA, assets: pd.Index) -> np.ndarray:
+    """
+    Total non-cash quantity held per entry of `assets` (0.0 where not held).
+    """
+    asset_qty = _group_sum(pos.asset_codes, np.where(pos.is_cash, 0.0, pos.qty), len(pos.asset_index))
+    idx = pos.asset_index.get_indexer(assets)
+    held = idx >= 0
+    out = np.zeros(len(assets))
+    out[held] = asset_qty[idx[held]]
+    return out
+
+def portfolio_valuation(positions: pd.DataFrame | _PositionsSoA, spot_prices: pd.Series) -> tuple[float, pd.Series]:
     """
     spot_prices: Series indexed by asset tickers (excluding CASH_USD).
     """
-    pos = positions.copy()
-    pos["price"] = pos["asset"].map(lambda a: 1.0 if a == "CASH_USD" else float(spot_prices.get(a, np.nan)))
-    pos["value"] = pos["quantity"] * pos["price"]
-    asset_values = pos.groupby("asset")["value"].sum()
+    pos = _as_soa(positions)
+    # unpriced assets contribute 0, as a pandas groupby-sum would
+    value = np.nan_to_num(_position_values(pos, spot_prices))
+    asset_values = pd.Series(
+        _group_sum(pos.asset_codes, value, len(pos.asset_index)),
+        index=pos.asset_index,
+        name="value",
+    )
     port_val = float(asset_values.sum())
     return port_val, asset_values
 
@@ -47,16 +125,17 @@ def portfolio_returns(positions: pd.DataFrame, prices: pd.DataFrame) -> tuple[pd
     asset_values_risky = asset_values.reindex(risky_assets).fillna(0.0)
     weights = asset_values_risky / port_val if port_val != 0 else asset_values_risky*0.0
 
-    # Portfolio daily return and PnL (linear approximation)
-    port_ret = rets[risky_assets].mul(weights, axis=1).sum(axis=1)
-    pnl = port_ret * port_val  # currency PnL
-    return rets[risky_assets], pnl
+    # Portfolio daily return and PnL (linear approximation) as one GEMV
+    risky_rets = rets[risky_assets]
+    w = weights.to_numpy(dtype=np.float64)
+    pnl = pd.Series(risky_rets.to_numpy(dtype=np.float64) @ w * port_val, index=rets.index)  # currency PnL
+    return risky_rets, pnl
 
-def exposures_by_asset_class(positions: pd.DataFrame, spot_prices: pd.Series) -> pd.DataFrame:
-    pos = positions.copy()
-    pos["price"] = pos["asset"].map(lambda a: 1.0 if a == "CASH_USD" else float(spot_prices.get(a, np.nan)))
-    pos["value"] = pos["quantity"] * pos["price"]
-    out = pos.groupby("asset_class")["value"].sum().sort_values(ascending=False).reset_index()
+def exposures_by_asset_class(positions: pd.DataFrame | _PositionsSoA, spot_prices: pd.Series) -> pd.DataFrame:
+    pos = _as_soa(positions)
+    value = np.nan_to_num(_position_values(pos, spot_prices))
+    exposure = _group_sum(pos.asset_class_codes, value, len(pos.asset_classes))
+    out = pd.Series(exposure, index=pos.asset_classes, name="value").sort_values(ascending=False).reset_index()
     out.rename(columns={"value": "exposure_value"}, inplace=True)
     out["exposure_pct"] = out["exposure_value"] / out["exposure_value"].sum()
     return out
@@ -1,3 +1,10 @@
+import os
+
+# numba's TBB threading layer can hang interpreter shutdown once a parallel kernel
+# has run on Streamlit's script thread; prefer OpenMP unless configured otherwise.
+# Must be set before risk_engine (and thus numba) is imported.
+os.environ.setdefault("NUMBA_THREADING_LAYER_PRIORITY", "omp tbb workqueue")
+
 import pandas as pd
 import numpy as np
 import streamlit as st
@@ -29,10 +36,16 @@ with st.sidebar:
     hist_lookback = st.slider("Historical stress lookback (days)", min_value=126, max_value=1000, value=504, step=21)
     window_days = st.selectbox("Historical stress window (days)", options=[5, 10, 20], index=1)
 
-@st.cache_data(show_spinner=False)
+# cache_resource keeps one shared engine (and its internal caches) across reruns
+@st.cache_resource(show_spinner=False)
 def load_engine(positions_path: str, prices_path: str) -> RiskEngine:
     return RiskEngine.from_csv(positions_path, prices_path)
 
+@st.cache_data(show_spinner=False)
+def compute_stats(_engine: RiskEngine, prices_key: tuple, lookback_days: int):
+    # _engine is not hashed; prices_key identifies the loaded data instead
+    return _engine._compute_stats(lookback_days)
+
 @st.cache_data(show_spinner=False)
 def load_csv(path: str) -> pd.DataFrame:
     return pd.read_csv(path)
@@ -43,12 +56,14 @@ except Exception as e:
     st.error(f"Failed to load inputs: {e}")
     st.stop()
 
+prices_key = (positions_path, prices_path, engine.prices.index[-1], len(engine.prices))
 report = engine.build_report(
     lookback_days=lookback,
     horizon_days=horizon,
     alpha=float(alpha),
     mc_sims=int(mc_sims),
     include_component_var=show_component,
+    stats=compute_stats(engine, prices_key, lookback),
 )
 
 # Top KPIs
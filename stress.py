@@ -1,18 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Dict, List
+from typing import Optional
 
 import numpy as np
 import pandas as pd
 
-from .portfolio import portfolio_valuation
+from ._compat import njit
+from .portfolio import _PositionsSoA, _aligned_qty_vector, portfolio_valuation
 
-@dataclass(frozen=True)
-class ScenarioResult:
-    scenario: str
-    pnl: float
-    pnl_pct: float
+@njit(cache=True)
+def _worst_window(vals: np.ndarray, k: int) -> tuple[int, float]:
+    """
+    Index i minimising vals[i + k] - vals[i] (NaN windows skipped) and that minimum.
+    Returns i = -1 when no complete window exists.
+    """
+    best_i = -1
+    best = np.inf
+    for i in range(vals.shape[0] - k):
+        d = vals[i + k] - vals[i]
+        if d < best:
+            best = d
+            best_i = i
+    return best_i, best
 
 class StressTester:
     """
@@ -21,28 +30,29 @@ class StressTester:
       2) Historical stress window: worst N-day PnL in lookback window
     """
 
-    def __init__(self, positions: pd.DataFrame, prices: pd.DataFrame):
-        self.positions = positions.copy()
-        self.prices = prices.copy().sort_index()
+    def __init__(self, positions: pd.DataFrame, prices: pd.DataFrame, pos: Optional[_PositionsSoA] = None):
+        self.positions = positions
+        self.prices = prices if prices.index.is_monotonic_increasing else prices.sort_index()
+        self._pos = pos if pos is not None else _PositionsSoA.from_frame(self.positions)
+        # positions are static, so align quantities to the price columns once
+        self._qty_aligned = _aligned_qty_vector(self._pos, self.prices.columns)
+        self._cash = self._pos.cash
 
     def run_scenarios(self, scenarios: pd.DataFrame) -> pd.DataFrame:
         asof = self.prices.index[-1]
         spot = self.prices.loc[asof]
-        port_val, _ = portfolio_valuation(self.positions, spot)
+        port_val, _ = portfolio_valuation(self._pos, spot)
 
-        results: List[ScenarioResult] = []
-        for _, row in scenarios.iterrows():
-            name = str(row.get("scenario", "Unnamed"))
-            shocked = spot.copy()
-            for a in shocked.index:
-                col = f"{a}_shock"
-                if col in row and pd.notna(row[col]):
-                    shocked[a] = shocked[a] * (1.0 + float(row[col]))
-            shocked_val, _ = portfolio_valuation(self.positions, shocked)
-            pnl = shocked_val - port_val
-            results.append(ScenarioResult(name, float(pnl), float(pnl / port_val if port_val else 0.0)))
+        # (S, N) matrix of per-asset shocks; missing columns / NaN mean "unshocked"
+        shocks = scenarios.reindex(columns=[f"{a}_shock" for a in spot.index]).fillna(0.0).to_numpy(dtype=np.float64)
+        # NaN spot prices contribute nothing, as in portfolio_valuation
+        spot_arr = np.nan_to_num(spot.to_numpy(dtype=np.float64))
+        shocked_vals = (spot_arr * (1.0 + shocks)) @ self._qty_aligned + self._cash
 
-        out = pd.DataFrame([r.__dict__ for r in results]).sort_values("pnl")
+        pnls = shocked_vals - port_val
+        pnl_pcts = pnls / port_val if port_val else np.zeros_like(pnls)
+        names = scenarios["scenario"].astype(str).to_numpy() if "scenario" in scenarios.columns else np.full(len(scenarios), "Unnamed")
+        out = pd.DataFrame({"scenario": names, "pnl": pnls, "pnl_pct": pnl_pcts}, index=scenarios.index).sort_values("pnl", kind="mergesort")
         return out
 
     def worst_window(self, lookback_days: int = 252, window_days: int = 10) -> pd.DataFrame:
@@ -52,20 +62,18 @@ class StressTester:
         px = self.prices.tail(lookback_days + window_days + 1)
         asof = px.index[-1]
         spot = px.loc[asof]
-        port_val, _ = portfolio_valuation(self.positions, spot)
+        port_val, _ = portfolio_valuation(self._pos, spot)
 
         # compute daily portfolio value time series (static positions)
         # vectorized
-        pos = self.positions[self.positions["asset"] != "CASH_USD"].copy()
-        # align quantities
-        qty = pos.set_index("asset")["quantity"].reindex(px.columns).fillna(0.0).values
-        val_series = (px.values * qty).sum(axis=1) + float(self.positions.loc[self.positions["asset"] == "CASH_USD", "quantity"].sum())
-        val_series = pd.Series(val_series, index=px.index, name="portfolio_value")
+        val_series = px.to_numpy(dtype=np.float64) @ self._qty_aligned + self._cash
 
-        # rolling pnl over window
-        rolling_pnl = val_series.diff(window_days)
-        worst_date = rolling_pnl.idxmin()
-        worst_pnl = float(rolling_pnl.loc[worst_date])
+        # worst rolling pnl over window, fused difference + argmin
+        i, worst_pnl = _worst_window(np.ascontiguousarray(val_series, dtype=np.float64), int(window_days))
+        if i < 0:
+            raise ValueError(f"Not enough price history for a {window_days}-day window")
+        worst_date = px.index[i + window_days]
+        worst_pnl = float(worst_pnl)
         worst_pct = float(worst_pnl / port_val if port_val else 0.0)
 
         out = pd.DataFrame([{
@@ -1,4 +1,6 @@
 import pandas as pd
+import numpy as np
+import pytest
 from risk_engine import RiskEngine
 
 def test_smoke():
@@ -6,3 +8,178 @@ def test_smoke():
     report = engine.build_report()
     assert report.portfolio_value > 0
     assert not report.var_cvar.empty
+
+def test_valuation_drops_nan_keys():
+    from risk_engine.portfolio import exposures_by_asset_class, portfolio_valuation
+
+    positions = pd.DataFrame({
+        "asset": ["SPY", "TLT", None, "CASH_USD"],
+        "quantity": [10.0, 5.0, 7.0, 100.0],
+        "asset_class": ["Equity", np.nan, "Equity", "Cash"],
+    })
+    spot = pd.Series({"SPY": 400.0, "TLT": 100.0})
+
+    port_val, asset_values = portfolio_valuation(positions, spot)
+    assert port_val == 4000.0 + 500.0 + 100.0
+    assert set(asset_values.index) == {"SPY", "TLT", "CASH_USD"}
+
+    exposures = exposures_by_asset_class(positions, spot).set_index("asset_class")["exposure_value"]
+    assert exposures.to_dict() == {"Equity": 4000.0, "Cash": 100.0}
+
+def test_asset_values_sorted_by_asset():
+    from risk_engine.portfolio import portfolio_valuation
+
+    positions = pd.DataFrame({"asset": ["SPY", "TLT", "CASH_USD"], "quantity": [1.0, 2.0, 3.0]})
+    _, asset_values = portfolio_valuation(positions, pd.Series({"SPY": 1.0, "TLT": 1.0}))
+    assert list(asset_values.index) == ["CASH_USD", "SPY", "TLT"]
+
+def test_mc_seeds_do_not_share_blocks():
+    from risk_engine.var import _MC_BLOCK, _mc_block_seeds, _mc_port_rets
+
+    a = np.empty(_MC_BLOCK)
+    b = np.empty(2 * _MC_BLOCK)
+    _mc_port_rets(0.0, 1.0, _mc_block_seeds(124, a.size), a)
+    _mc_port_rets(0.0, 1.0, _mc_block_seeds(123, b.size), b)
+    assert not np.array_equal(a, b[_MC_BLOCK:])
+
+def test_var_cvar_from_losses_matches_higher_quantile():
+    from risk_engine.var import _var_cvar_from_losses
+
+    losses = np.random.default_rng(0).standard_normal(1001)
+    for alpha in (0.9, 0.95, 0.99):
+        var, cvar = _var_cvar_from_losses(losses, alpha)
+        expected = np.quantile(losses, alpha, method="higher")
+        assert var == expected
+        assert np.isclose(cvar, losses[losses >= expected].mean())
+
+    # flat days tie at the VaR; every tied loss belongs to the tail
+    tied = np.r_[np.zeros(95), np.full(5, 1.0), np.full(5, 2.0)]
+    var, cvar = _var_cvar_from_losses(tied, 0.9)
+    assert var == 0.0
+    assert np.isclose(cvar, tied.mean())
+
+def _toy_book():
+    dates = pd.date_range("2024-01-01", periods=8, freq="D")
+    prices = pd.DataFrame({
+        "SPY": [100.0, 101.0, 99.0, 97.0, np.nan, 96.0, 98.0, 102.0],
+        "TLT": [50.0, 50.5, 51.0, 50.0, 49.0, 49.5, np.nan, 50.0],
+        "GLD": [20.0, 20.0, 21.0, 22.0, 21.5, 21.0, 20.5, 20.0],
+    }, index=dates)
+    positions = pd.DataFrame({
+        "asset": ["SPY", "TLT", "CASH_USD"],
+        "quantity": [10.0, 20.0, 500.0],
+        "asset_class": ["Equity", "Rates", "Cash"],
+    })
+    return positions, prices
+
+def test_run_scenarios_matches_loop_reference():
+    from risk_engine.portfolio import portfolio_valuation
+    from risk_engine.stress import StressTester
+
+    positions, prices = _toy_book()
+    # GLD_shock missing entirely; a NaN shock means "unshocked"
+    scenarios = pd.DataFrame({
+        "scenario": ["down", "mixed", "flat"],
+        "SPY_shock": [-0.10, 0.05, np.nan],
+        "TLT_shock": [-0.02, np.nan, 0.0],
+    })
+    out = StressTester(positions, prices).run_scenarios(scenarios).set_index("scenario")
+
+    spot = prices.iloc[-1]
+    port_val, _ = portfolio_valuation(positions, spot)
+    for _, row in scenarios.iterrows():
+        shocked = spot.copy()
+        for a in shocked.index:
+            col = f"{a}_shock"
+            if col in row and pd.notna(row[col]):
+                shocked[a] = shocked[a] * (1.0 + float(row[col]))
+        pnl = portfolio_valuation(positions, shocked)[0] - port_val
+        assert np.isclose(out.loc[row["scenario"], "pnl"], pnl)
+        assert np.isclose(out.loc[row["scenario"], "pnl_pct"], pnl / port_val)
+
+def test_worst_window_matches_pandas_reference():
+    from risk_engine.stress import StressTester
+
+    positions, prices = _toy_book()  # NaN prices leave gaps in the value series
+    k = 2
+    out = StressTester(positions, prices).worst_window(lookback_days=5, window_days=k).iloc[0]
+
+    px = prices.tail(5 + k + 1)
+    qty = positions.set_index("asset")["quantity"].reindex(px.columns).fillna(0.0).values
+    val = pd.Series(px.values @ qty + 500.0, index=px.index)
+    rolling = val.diff(k)
+    assert out["worst_end_date"] == rolling.idxmin()
+    assert np.isclose(out["worst_window_pnl"], rolling.min())
+
+def test_historical_horizon_matches_rolling_sum():
+    from risk_engine.var import historical_var_cvar
+
+    pnl = pd.Series(np.random.default_rng(1).standard_normal(300) * 1000.0)
+    pnl.iloc[[10, 50]] = np.nan
+    for h in (1, 5, 10):
+        losses = -pnl.dropna().rolling(h).sum().dropna().to_numpy()
+        var = np.quantile(losses, 0.99, method="higher")
+        got_var, got_cvar = historical_var_cvar(pnl, 1e6, alpha=0.99, horizon_days=h)
+        assert np.isclose(got_var, var)
+        assert np.isclose(got_cvar, losses[losses >= var].mean())
+
+def test_stress_handles_nan_quantity_and_empty_positions():
+    from risk_engine.stress import StressTester
+
+    positions, prices = _toy_book()
+    scenarios = pd.DataFrame({"scenario": ["down"], "SPY_shock": [-0.10], "TLT_shock": [-0.02]})
+
+    nan_qty = positions.copy()
+    nan_qty.loc[nan_qty["asset"] == "TLT", "quantity"] = np.nan
+    flat = nan_qty[nan_qty["asset"] != "TLT"]
+    got = StressTester(nan_qty, prices)
+    ref = StressTester(flat, prices)
+    pd.testing.assert_frame_equal(got.run_scenarios(scenarios), ref.run_scenarios(scenarios))
+    pd.testing.assert_frame_equal(got.worst_window(5, 2), ref.worst_window(5, 2))
+
+    empty = positions.iloc[0:0]
+    window = StressTester(empty, prices).worst_window(5, 2).iloc[0]
+    assert window["worst_window_pnl"] == 0.0
+
+def test_build_report_rejects_mismatched_stats():
+    engine = RiskEngine.from_csv("data/positions.csv", "data/prices.csv")
+    stats = engine._compute_stats(126)
+    assert engine.build_report(lookback_days=126, stats=stats).portfolio_value == stats.port_val
+    with pytest.raises(ValueError):
+        engine.build_report(lookback_days=252, stats=stats)
+
+def test_compute_stats_matches_pandas_reference():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", periods=40, freq="D")
+    prices = pd.DataFrame(
+        100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, (40, 3)), axis=0)),
+        index=dates, columns=["SPY", "TLT", "GLD"],
+    )
+    prices.iloc[12, 0] = np.nan
+    prices.iloc[30, 1] = np.nan
+    # positions ordered unlike the price columns; GLD is priced but not held
+    positions = pd.DataFrame({"asset": ["TLT", "CASH_USD", "SPY"], "quantity": [20.0, 500.0, 10.0]})
+    engine = RiskEngine(positions, prices)
+    risky = ["TLT", "SPY"]
+    for lookback in (39, 20):
+        stats = engine._compute_stats(lookback)
+
+        px = prices.tail(lookback + 1)
+        rets = px.pct_change().dropna()[risky]
+        values = px.iloc[-1][risky] * [20.0, 10.0]
+        port_val = values.sum() + 500.0
+        weights = values / port_val
+        pnl = rets.mul(weights, axis=1).sum(axis=1) * port_val
+
+        assert stats.lookback_days == lookback
+        assert list(stats.risky_assets) == risky
+        assert stats.port_val == pytest.approx(port_val)
+        np.testing.assert_allclose(stats.weights, weights.to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(stats.mu, rets.mean().to_numpy(), rtol=1e-4, atol=1e-7)
+        np.testing.assert_allclose(stats.cov, rets.cov().to_numpy(), rtol=1e-4, atol=1e-8)
+        pd.testing.assert_index_equal(stats.pnl.index, pnl.index)
+        np.testing.assert_allclose(stats.pnl.to_numpy(), pnl.to_numpy(), rtol=1e-4, atol=1e-4)
+
+        component = engine.build_report(lookback_days=lookback, mc_sims=1000, stats=stats).component_var
+        assert sorted(component["asset"]) == sorted(risky)
+        np.testing.assert_allclose(component.set_index("asset")["weight"][risky].to_numpy(), weights.to_numpy())
@@ -4,28 +4,69 @@ import numpy as np
 import pandas as pd
 from scipy.stats import norm
 
+from ._compat import HAS_NUMBA, njit, prange
+
+# Standard normal quantile z = ppf(alpha) and density phi(z) for the confidence
+# levels the UI exposes; other alphas fall back to scipy
+_Z = {a: float(norm.ppf(a)) for a in (0.90, 0.95, 0.975, 0.99, 0.995)}
+_PHI = {a: float(norm.pdf(z)) for a, z in _Z.items()}
+
+# Monte Carlo draws generated per block (32 KB of float32 normals)
+_MC_BLOCK = 8192
+
+def _z_phi(alpha: float) -> tuple[float, float]:
+    z = _Z.get(alpha)
+    if z is None:
+        z = float(norm.ppf(alpha))
+        return z, float(norm.pdf(z))
+    return z, _PHI[alpha]
+
 def _scale_horizon(x: float, horizon_days: int) -> float:
     # sqrt time scaling for vol; mean scales linearly but typically negligible for VaR horizon=1
     return x * np.sqrt(horizon_days)
 
-def parametric_var_cvar(mu: np.ndarray, cov: np.ndarray, weights: np.ndarray, port_val: float, alpha: float = 0.99, horizon_days: int = 1) -> tuple[float, float]:
+@njit(cache=True, fastmath=True)
+def _tail_reduce(losses: np.ndarray, k: int) -> tuple[float, float]:
+    part = np.partition(losses, k)
+    var = part[k]
+    # part[k:] holds exactly n-k order statistics; losses tied with VaR can also
+    # land in part[:k] and belong to the ">= VaR" tail
+    ties = np.sum(part[:k] == var)
+    return var, (part[k:].sum() + ties * var) / (part.shape[0] - k + ties)
+
+def _var_cvar_from_losses(losses: np.ndarray, alpha: float) -> tuple[float, float]:
+    """
+    VaR as the alpha-quantile of losses and CVaR as the mean of losses at or beyond it.
+    Uses a single O(n) partition instead of a full sort; the quantile is the
+    order statistic at ceil(alpha*(n-1)), i.e. np.quantile(..., method="higher"),
+    rather than the linearly interpolated default.
+    """
+    n = losses.size
+    k = int(np.ceil(alpha * (n - 1)))
+    var, cvar = _tail_reduce(np.ascontiguousarray(losses, dtype=np.float64), k)
+    return float(var), float(cvar)
+
+def parametric_var_cvar(mu: np.ndarray, cov: np.ndarray, weights: np.ndarray, port_val: float, alpha: float = 0.99, horizon_days: int = 1, covw: np.ndarray | None = None, sigma_p: float | None = None) -> tuple[float, float]:
     """
     Gaussian VaR/CVaR on portfolio PnL (positive number = loss).
+    covw, sigma_p: optional precomputed cov @ weights and sqrt(w.cov.w).
     """
     # portfolio mean & std of returns
     mu_p = float(weights @ mu)
-    var_p = float(weights @ cov @ weights)
-    sigma_p = np.sqrt(max(var_p, 0.0))
+    if sigma_p is None:
+        if covw is None:
+            covw = cov @ weights
+        sigma_p = np.sqrt(max(float(weights @ covw), 0.0))
 
     # horizon scaling
     mu_h = mu_p * horizon_days
     sigma_h = sigma_p * np.sqrt(horizon_days)
 
-    z = norm.ppf(alpha)
+    z, phi = _z_phi(alpha)
     # Loss = -(return)*V. VaR loss at alpha:
     var_loss = (-(mu_h) + z * sigma_h) * port_val
     # CVaR for normal: sigma * phi(z)/(1-alpha) - mu
-    cvar_loss = (-(mu_h) + sigma_h * norm.pdf(z) / (1 - alpha)) * port_val
+    cvar_loss = (-(mu_h) + sigma_h * phi / (1 - alpha)) * port_val
     return float(var_loss), float(cvar_loss)
 
 def historical_var_cvar(pnl: pd.Series, port_val: float, alpha: float = 0.99, horizon_days: int = 1) -> tuple[float, float]:
@@ -33,46 +74,89 @@ def historical_var_cvar(pnl: pd.Series, port_val: float, alpha: float = 0.99, ho
     Historical VaR/CVaR based on pnl series (daily, currency units).
     For horizon_days>1, aggregate by rolling sum.
     """
-    x = pnl.copy().dropna()
+    x = pnl.dropna().to_numpy(dtype=np.float64)
     if horizon_days > 1:
-        x = x.rolling(horizon_days).sum().dropna()
+        # rolling sums via cumulative-sum differences (no NaN warm-up rows)
+        cs = np.cumsum(x)
+        x = cs[horizon_days - 1:].copy()
+        x[1:] -= cs[:-horizon_days]
     # Loss is -PnL
     losses = -x
-    var = float(np.quantile(losses, alpha))
-    tail = losses[losses >= var]
-    cvar = float(tail.mean()) if len(tail) else var
-    return var, cvar
-
-def monte_carlo_var_cvar(mu: np.ndarray, cov: np.ndarray, weights: np.ndarray, port_val: float, alpha: float = 0.99, horizon_days: int = 1, n_sims: int = 20000, seed: int = 123) -> tuple[float, float]:
-    rng = np.random.default_rng(seed)
-    # Draw daily returns ~ N(mu, cov), aggregate to horizon by summing means and scaling cov
-    mu_h = mu * horizon_days
-    cov_h = cov * horizon_days
-    sims = rng.multivariate_normal(mu_h, cov_h, size=n_sims)
-    port_rets = sims @ weights
+    return _var_cvar_from_losses(losses, alpha)
+
+def _mc_block_seeds(seed: int, n_sims: int) -> np.ndarray:
+    # independent per-block seeds spawned from one SeedSequence, so nearby seeds never share blocks
+    n_blocks = (n_sims + _MC_BLOCK - 1) // _MC_BLOCK
+    return np.random.SeedSequence(seed).generate_state(n_blocks)
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _mc_port_rets(mu_p_h: float, sigma_p_h: float, block_seeds: np.ndarray, out: np.ndarray) -> None:
+    """
+    Fill out with N(mu_p_h, sigma_p_h^2) draws, one block per parallel iteration.
+    Each block reseeds its thread's generator with block_seeds[block], so results
+    are deterministic regardless of thread count.
+    """
+    n = out.shape[0]
+    for b in prange(block_seeds.shape[0]):
+        np.random.seed(block_seeds[b])
+        for i in range(b * _MC_BLOCK, min((b + 1) * _MC_BLOCK, n)):
+            out[i] = mu_p_h + sigma_p_h * np.random.standard_normal()
+
+def monte_carlo_var_cvar(mu: np.ndarray, cov: np.ndarray, weights: np.ndarray, port_val: float, alpha: float = 0.99, horizon_days: int = 1, n_sims: int = 20000, seed: int = 123, sigma_p: float | None = None) -> tuple[float, float]:
+    """
+    Monte Carlo VaR/CVaR under the Gaussian model (positive number = loss).
+    A linear portfolio of jointly normal returns is itself normal with mean w.mu_h and
+    variance w.cov_h.w, so drawing the portfolio return directly is statistically
+    equivalent to simulating every asset and projecting onto the weights.
+    sigma_p: optional precomputed daily portfolio volatility sqrt(w.cov.w).
+    """
+    if sigma_p is None:
+        sigma_p = np.sqrt(max(float(weights @ cov @ weights), 0.0))
+    # Horizon aggregation: means sum, covariance scales linearly
+    mu_p_h = float(weights @ mu) * horizon_days
+    sigma_p_h = sigma_p * np.sqrt(horizon_days)
+    port_rets = np.empty(n_sims)
+    if HAS_NUMBA:
+        _mc_port_rets(mu_p_h, sigma_p_h, _mc_block_seeds(seed, n_sims), port_rets)
+    else:
+        # float32 normals drawn in cache-sized blocks, scaled in float64 in place
+        rng = np.random.default_rng(seed)
+        for start in range(0, n_sims, _MC_BLOCK):
+            block = port_rets[start:start + _MC_BLOCK]
+            block[:] = rng.standard_normal(block.shape[0], dtype=np.float32)
+            block *= sigma_p_h
+            block += mu_p_h
     pnl = port_rets * port_val
     losses = -pnl
-    var = float(np.quantile(losses, alpha))
-    tail = losses[losses >= var]
-    cvar = float(tail.mean()) if len(tail) else var
-    return var, cvar
+    return _var_cvar_from_losses(losses, alpha)
 
-def component_var_parametric(mu: np.ndarray, cov: np.ndarray, weights: np.ndarray, port_val: float, alpha: float = 0.99, horizon_days: int = 1) -> pd.DataFrame:
+@njit(cache=True, fastmath=True)
+def _component_var_kernel(mu: np.ndarray, covw: np.ndarray, weights: np.ndarray, port_val: float, z: float, sigma_p: float, horizon_days: int) -> tuple[np.ndarray, np.ndarray]:
+    if sigma_p == 0.0:
+        return np.zeros_like(weights), np.zeros_like(weights)
+    # marginal VaR in return space (loss) per d(weight_i)
+    # VaR_loss = ( -mu_h + z*sigma_h )*V; derivative wrt w_i is ( -mu_i*h + z*( (cov w)_i / sigma_p )*sqrt(h) )*V
+    marginal = (-(mu * horizon_days) + z * (covw / sigma_p) * np.sqrt(horizon_days)) * port_val
+    return marginal, weights * marginal
+
+def component_var_parametric(mu: np.ndarray, cov: np.ndarray, weights: np.ndarray, port_val: float, alpha: float = 0.99, horizon_days: int = 1, covw: np.ndarray | None = None, sigma_p: float | None = None) -> pd.DataFrame:
     """
     Component VaR for Gaussian model using Euler allocation.
     Returns dataframe with weight, marginal_VaR (per unit weight), component_VaR (currency).
+    covw, sigma_p: optional precomputed cov @ weights and sqrt(w.cov.w).
     """
-    # Portfolio sigma
-    sigma_p = np.sqrt(max(float(weights @ cov @ weights), 0.0))
-    if sigma_p == 0.0:
-        return pd.DataFrame({"weight": weights, "marginal_VaR": np.zeros_like(weights), "component_VaR": np.zeros_like(weights)})
-
-    z = norm.ppf(alpha)
-    # marginal VaR in return space (loss) per d(weight_i)
-    # VaR_loss = ( -mu_h + z*sigma_h )*V; derivative wrt w_i is ( -mu_i*h + z*( (cov w)_i / sigma_p )*sqrt(h) )*V
-    mu_h = mu * horizon_days
-    sigma_scale = np.sqrt(horizon_days)
-    covw = cov @ weights
-    marginal = (-(mu_h) + z * (covw / sigma_p) * sigma_scale) * port_val
-    component = weights * marginal
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    if covw is None:
+        covw = cov @ weights
+    if sigma_p is None:
+        sigma_p = np.sqrt(max(float(weights @ covw), 0.0))
+    marginal, component = _component_var_kernel(
+        np.ascontiguousarray(mu, dtype=np.float64),
+        np.ascontiguousarray(covw, dtype=np.float64),
+        weights,
+        float(port_val),
+        _z_phi(alpha)[0],
+        float(sigma_p),
+        int(horizon_days),
+    )
     return pd.DataFrame({"weight": weights, "marginal_VaR": marginal, "component_VaR": component})